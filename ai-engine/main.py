@@ -3,18 +3,20 @@ EduNiti AI Recommendation Engine
 FastAPI backend for personalized career and education recommendations
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Body, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from pydantic import BaseModel, TypeAdapter, field_validator
+from typing import List, Dict, Optional, Any, Tuple, Literal, Annotated
+from functools import lru_cache, cached_property
+from collections import OrderedDict, defaultdict
+import heapq
+import re
+import threading
 import pandas as pd
 import numpy as np
-# from sklearn.feature_extraction.text import TfidfVectorizer
-# from sklearn.metrics.pairwise import cosine_similarity
-# from sklearn.cluster import KMeans
-import httpx
 import os
+import orjson
 from dotenv import load_dotenv
 import logging
 
@@ -52,6 +54,25 @@ class UserProfile(BaseModel):
     interests: List[str] = []
     location: Optional[Dict[str, Any]] = None
     quiz_scores: Optional[Dict[str, float]] = None
+    
+    @field_validator('interests')
+    @classmethod
+    def normalize_interests(cls, interests: List[str]) -> List[str]:
+        """Strip whitespace and drop blank interests at parse time"""
+        return [interest.strip() for interest in interests if interest.strip()]
+    
+    @cached_property
+    def interest_key(self) -> Tuple[str, ...]:
+        """Lower-cased, sorted interests, computed once per profile"""
+        return tuple(sorted(interest.lower() for interest in self.interests))
+    
+    @cached_property
+    def quiz_key(self) -> Tuple[Tuple[str, float], ...]:
+        """Lower-cased, sorted (subject, score) pairs, computed once per profile"""
+        return tuple(sorted(
+            (subject.lower(), score_val)
+            for subject, score_val in (self.quiz_scores or {}).items()
+        ))
 
 class QuizResponse(BaseModel):
     user_id: str
@@ -61,7 +82,7 @@ class QuizResponse(BaseModel):
 
 class RecommendationRequest(BaseModel):
     user_profile: UserProfile
-    recommendation_type: str  # 'stream', 'college', 'career', 'scholarship'
+    recommendation_type: Literal['stream', 'college', 'career', 'scholarship']
     limit: int = 10
 
 class RecommendationResponse(BaseModel):
@@ -92,11 +113,18 @@ class CareerPathway(BaseModel):
     growth_prospects: str
 
 # Global variables for ML models
-# vectorizer = None
 college_data = None
 career_data = None
 stream_data = None
 
+# Lookup tables derived from the loaded data (see the build_*_index functions)
+stream_index = None
+stream_weights = None
+college_records = None
+college_columns = None
+career_records = None
+careers_by_stream = None
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize ML models and load data on startup"""
@@ -196,92 +224,241 @@ async def load_sample_data():
             'description': 'Focus on business and financial subjects'
         }
     ])
+    
+    build_stream_index()
+    build_college_index()
+    build_career_index()
+    
+    # Cached payloads were computed from the previous data
+    clear_response_cache()
 
-def calculate_stream_recommendation(user_profile: UserProfile) -> List[StreamRecommendation]:
-    """Calculate stream recommendations based on user profile"""
-    recommendations = []
+def tokenize(text: str) -> frozenset:
+    """Lower-cased word tokens of a piece of text"""
+    return frozenset(re.findall(r"\w+", text.lower()))
+
+def build_stream_index():
+    """Precompute display fields and scoring weight matrices for every stream"""
+    global stream_index, stream_weights
     
-    # Simple scoring algorithm based on interests and quiz scores
-    stream_scores = {}
+    rows = stream_data.to_dict('records')
     
-    for _, stream_row in stream_data.iterrows():
-        score = 0
-        stream = stream_row['stream']
-        
-        # Score based on interests
-        for interest in user_profile.interests:
-            if interest.lower() in stream_row['subjects']:
-                score += 2
-            if interest.lower() in stream_row['careers']:
-                score += 3
-        
-        # Score based on quiz results
-        if user_profile.quiz_scores:
-            for subject, score_val in user_profile.quiz_scores.items():
-                if subject.lower() in [s.lower() for s in stream_row['subjects']]:
-                    score += score_val * 0.5
-        
-        stream_scores[stream] = score
+    stream_index = {
+        row['stream']: {
+            'career_paths': row['careers'],
+            'required_subjects': row['subjects']
+        }
+        for row in rows
+    }
+    
+    # Each stream is a row. Lower-cased interests are compared with the
+    # subject/career names exactly as written, while quiz subjects are
+    # compared case-insensitively, so each kind gets its own columns
+    interest_vocabulary = {}
+    quiz_vocabulary = {}
+    for row in rows:
+        for term in list(row['subjects']) + list(row['careers']):
+            interest_vocabulary.setdefault(term, len(interest_vocabulary))
+        for subject in row['subjects']:
+            quiz_vocabulary.setdefault(subject.lower(), len(quiz_vocabulary))
+    
+    subject_matrix = np.zeros((len(rows), len(interest_vocabulary)))
+    career_matrix = np.zeros((len(rows), len(interest_vocabulary)))
+    quiz_matrix = np.zeros((len(rows), len(quiz_vocabulary)))
+    for i, row in enumerate(rows):
+        subject_matrix[i, [interest_vocabulary[s] for s in row['subjects']]] = 1
+        career_matrix[i, [interest_vocabulary[c] for c in row['careers']]] = 1
+        quiz_matrix[i, [quiz_vocabulary[s.lower()] for s in row['subjects']]] = 1
+    
+    stream_weights = {
+        'streams': [row['stream'] for row in rows],
+        'interest_vocabulary': interest_vocabulary,
+        'quiz_vocabulary': quiz_vocabulary,
+        # 2 points per matching subject interest, 3 per matching career interest
+        'interests': 2 * subject_matrix + 3 * career_matrix,
+        # Half of the quiz score for every matching subject
+        'quiz_scores': 0.5 * quiz_matrix
+    }
+    
+    # Cached scores were computed against the previous index
+    score_streams.cache_clear()
+
+def build_college_index():
+    """Precompute column arrays of the college fields used for scoring"""
+    global college_records, college_columns
+    
+    college_records = college_data.to_dict('records')
+    
+    stream_masks = defaultdict(lambda: np.zeros(len(college_records), dtype=bool))
+    program_token_masks = defaultdict(lambda: np.zeros(len(college_records), dtype=bool))
+    for i, college in enumerate(college_records):
+        for stream in college['streams']:
+            stream_masks[stream][i] = True
+        for token in tokenize(' '.join(college['programs'])):
+            program_token_masks[token][i] = True
+    
+    college_columns = {
+        'states': np.array([college['location']['state'] for college in college_records], dtype=object),
+        'streams': dict(stream_masks),
+        'program_tokens': dict(program_token_masks),
+        'cut_offs': np.array([college['cut_off'] for college in college_records], dtype=float)
+    }
+
+def build_career_index():
+    """Group career records by stream so filtering is a dict lookup"""
+    global career_records, careers_by_stream
+    
+    career_records = career_data.to_dict('records')
+    careers_by_stream = defaultdict(list)
+    for career in career_records:
+        careers_by_stream[career['stream']].append(career)
+
+def profile_vectors(interests: Tuple[str, ...], quiz_scores: Tuple[Tuple[str, float], ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Interest-count and quiz-score vectors of a profile over the stream vocabularies"""
+    interest_vocabulary = stream_weights['interest_vocabulary']
+    quiz_vocabulary = stream_weights['quiz_vocabulary']
+    interest_vector = np.zeros(len(interest_vocabulary))
+    quiz_vector = np.zeros(len(quiz_vocabulary))
+    
+    for interest in interests:
+        if interest in interest_vocabulary:
+            interest_vector[interest_vocabulary[interest]] += 1
+    
+    for subject, score_val in quiz_scores:
+        if subject in quiz_vocabulary:
+            quiz_vector[quiz_vocabulary[subject]] += score_val
+    
+    return interest_vector, quiz_vector
+
+@lru_cache(maxsize=4096)
+def score_streams(interests: Tuple[str, ...], quiz_scores: Tuple[Tuple[str, float], ...]) -> Tuple[Tuple[str, float], ...]:
+    """Score every stream for a canonical (lower-cased, sorted) profile key"""
+    interest_vector, quiz_vector = profile_vectors(interests, quiz_scores)
+    scores = stream_weights['interests'] @ interest_vector + stream_weights['quiz_scores'] @ quiz_vector
+    
+    return tuple(zip(stream_weights['streams'], scores.tolist()))
+
+def build_stream_recommendations(user_profile: UserProfile, stream_scores: Dict[str, float]) -> List[StreamRecommendation]:
+    """Turn per-stream scores into the top three stream recommendations"""
+    recommendations = []
     
     # Sort by score and create recommendations
-    sorted_streams = sorted(stream_scores.items(), key=lambda x: x[1], reverse=True)
+    top_streams = heapq.nlargest(3, stream_scores.items(), key=lambda x: x[1])
     
-    for stream, score in sorted_streams[:3]:
-        stream_row = stream_data[stream_data['stream'] == stream].iloc[0]
+    # The reasoning only depends on the profile, so format it once
+    reasoning = f"Based on your interests in {', '.join(user_profile.interests[:3])} and academic strengths"
+    
+    for stream, score in top_streams:
+        entry = stream_index[stream]
         
-        recommendations.append(StreamRecommendation(
+        # model_construct skips validation: every field comes from stream_index
+        # or the already-validated profile
+        recommendations.append(StreamRecommendation.model_construct(
             stream=stream,
             confidence=min(score / 10, 1.0),  # Normalize to 0-1
-            reasoning=f"Based on your interests in {', '.join(user_profile.interests[:3])} and academic strengths",
-            career_paths=stream_row['careers'],
-            required_subjects=stream_row['subjects']
+            reasoning=reasoning,
+            career_paths=entry['career_paths'],
+            required_subjects=entry['required_subjects']
         ))
     
     return recommendations
 
+def calculate_stream_recommendation(user_profile: UserProfile) -> List[StreamRecommendation]:
+    """Calculate stream recommendations based on user profile"""
+    # Simple scoring algorithm based on interests and quiz scores, memoized
+    # on the canonical profile keys since scoring does not depend on order
+    stream_scores = dict(score_streams(user_profile.interest_key, user_profile.quiz_key))
+    
+    return build_stream_recommendations(user_profile, stream_scores)
+
+def calculate_batch_stream_recommendations(user_profiles: List[UserProfile]) -> List[List[StreamRecommendation]]:
+    """Calculate stream recommendations for many profiles with one matrix product per weight matrix"""
+    if not user_profiles:
+        return []
+    
+    # One row per user over the stream vocabularies (users x terms)
+    vectors = [profile_vectors(profile.interest_key, profile.quiz_key) for profile in user_profiles]
+    interest_matrix = np.stack([interest_vector for interest_vector, _ in vectors])
+    quiz_matrix = np.stack([quiz_vector for _, quiz_vector in vectors])
+    
+    # (users x terms) @ (terms x streams) gives every user's stream scores at once
+    all_scores = interest_matrix @ stream_weights['interests'].T + quiz_matrix @ stream_weights['quiz_scores'].T
+    
+    return [
+        build_stream_recommendations(profile, dict(zip(stream_weights['streams'], scores)))
+        for profile, scores in zip(user_profiles, all_scores.tolist())
+    ]
+
 def calculate_college_recommendations(user_profile: UserProfile, limit: int = 10) -> List[CollegeRecommendation]:
     """Calculate college recommendations based on user profile"""
     recommendations = []
+    no_match = np.zeros(len(college_records), dtype=bool)
+    match_scores = np.zeros(len(college_records))
+    
+    # Location preference
+    user_state = user_profile.location.get('state') if user_profile.location else None
+    # Only a string can equal a college's state; anything else (e.g. a list)
+    # would broadcast against the array instead of being compared as a whole
+    state_match = college_columns['states'] == user_state if isinstance(user_state, str) else no_match
+    match_scores += 0.3 * state_match
+    
+    # Stream match
+    stream_match = college_columns['streams'].get(user_profile.stream, no_match)
+    match_scores += 0.4 * stream_match
+    
+    # Interest match, one row per interest: every word of the interest must
+    # appear as a word in the college's programs
+    interest_matches = []
+    for interest in user_profile.interests:
+        interest_match = no_match
+        tokens = tokenize(interest)
+        if tokens:
+            interest_match = np.logical_and.reduce([
+                college_columns['program_tokens'].get(token, no_match) for token in tokens
+            ])
+        interest_matches.append(interest_match)
+    for interest_match in interest_matches:
+        match_scores += 0.1 * interest_match
+    
+    # Cut-off consideration against 80% of each college's cut-off
+    if user_profile.quiz_scores:
+        avg_score = sum(user_profile.quiz_scores.values()) / len(user_profile.quiz_scores)
+        cut_off_match = avg_score >= college_columns['cut_offs'] * 0.8
+    else:
+        cut_off_match = no_match
+    match_scores += 0.2 * cut_off_match
     
-    for _, college in college_data.iterrows():
-        match_score = 0
+    # Rank indices first so reasons and models are only built for returned colleges
+    candidates = np.flatnonzero(match_scores > 0)
+    if limit >= 0:
+        top_colleges = heapq.nlargest(limit, candidates, key=lambda i: match_scores[i])
+    else:
+        # nlargest treats a negative n as 0; keep the [:limit] slice semantics
+        top_colleges = sorted(candidates, key=lambda i: match_scores[i], reverse=True)[:limit]
+    
+    for i in top_colleges:
+        college = college_records[i]
         reasons = []
         
-        # Location preference
-        if user_profile.location and college['location']['state'] == user_profile.location.get('state'):
-            match_score += 0.3
+        if state_match[i]:
             reasons.append("Located in your preferred state")
-        
-        # Stream match
-        if user_profile.stream and user_profile.stream in college['streams']:
-            match_score += 0.4
+        if stream_match[i]:
             reasons.append(f"Offers {user_profile.stream} programs")
-        
-        # Interest match
-        for interest in user_profile.interests:
-            if interest.lower() in ' '.join(college['programs']).lower():
-                match_score += 0.1
+        for interest, interest_match in zip(user_profile.interests, interest_matches):
+            if interest_match[i]:
                 reasons.append(f"Programs align with your interest in {interest}")
+        if cut_off_match[i]:
+            reasons.append("Your academic profile matches the college requirements")
         
-        # Cut-off consideration
-        if user_profile.quiz_scores:
-            avg_score = sum(user_profile.quiz_scores.values()) / len(user_profile.quiz_scores)
-            if avg_score >= college['cut_off'] * 0.8:  # 80% of cut-off
-                match_score += 0.2
-                reasons.append("Your academic profile matches the college requirements")
-        
-        if match_score > 0:
-            recommendations.append(CollegeRecommendation(
-                college_id=college['id'],
-                name=college['name'],
-                match_score=match_score,
-                reasons=reasons,
-                programs=college['programs']
-            ))
-    
-    # Sort by match score and return top recommendations
-    recommendations.sort(key=lambda x: x.match_score, reverse=True)
-    return recommendations[:limit]
+        # Fields are our own college records, no need to validate them again
+        recommendations.append(CollegeRecommendation.model_construct(
+            college_id=college['id'],
+            name=college['name'],
+            match_score=float(match_scores[i]),
+            reasons=reasons,
+            programs=college['programs']
+        ))
+    
+    return recommendations
 
 def calculate_career_recommendations(user_profile: UserProfile) -> List[CareerPathway]:
     """Calculate career recommendations based on user profile"""
@@ -289,12 +466,13 @@ def calculate_career_recommendations(user_profile: UserProfile) -> List[CareerPa
     
     # Filter careers by stream
     if user_profile.stream:
-        relevant_careers = career_data[career_data['stream'] == user_profile.stream]
+        relevant_careers = careers_by_stream.get(user_profile.stream, [])
     else:
-        relevant_careers = career_data
+        relevant_careers = career_records
     
-    for _, career in relevant_careers.iterrows():
-        recommendations.append(CareerPathway(
+    # Career records are trusted sample data, so skip model validation
+    for career in relevant_careers:
+        recommendations.append(CareerPathway.model_construct(
             career=career['career'],
             education_path=career['education_path'],
             skills_required=career['skills'],
@@ -305,10 +483,74 @@ def calculate_career_recommendations(user_profile: UserProfile) -> List[CareerPa
     
     return recommendations
 
+# Serializers for the cached recommendation payloads
+RECOMMENDATION_ADAPTERS = {
+    'stream': TypeAdapter(List[StreamRecommendation]),
+    'college': TypeAdapter(List[CollegeRecommendation]),
+    'career': TypeAdapter(List[CareerPathway])
+}
+
+# Serialized responses keyed on the profile fields scoring reads (see recommendation_cache_key)
+RESPONSE_CACHE_SIZE = 10_000
+response_cache: "OrderedDict[Tuple[Any, ...], bytes]" = OrderedDict()
+response_cache_lock = threading.Lock()
+
+def recommendation_cache_key(recommendation_type: str, user_profile: UserProfile, limit: int = 0) -> Tuple[Any, ...]:
+    """Hashable key built only from the profile fields the calculate_* functions read"""
+    state = user_profile.location.get('state') if user_profile.location else None
+    
+    return (
+        recommendation_type,
+        # Order matters: the reasoning text and college reasons follow it
+        tuple(user_profile.interests),
+        user_profile.stream,
+        # Non-string states never match a college, same as in the scoring
+        state if isinstance(state, str) else None,
+        tuple(sorted((user_profile.quiz_scores or {}).items())),
+        limit
+    )
+
+def cached_recommendations(recommendation_type: str, user_profile: UserProfile, limit: int = 0) -> bytes:
+    """Serialized recommendations for a profile; repeat profiles skip scoring entirely"""
+    key = recommendation_cache_key(recommendation_type, user_profile, limit)
+    
+    with response_cache_lock:
+        content = response_cache.get(key)
+        if content is not None:
+            response_cache.move_to_end(key)
+            return content
+    
+    # Score outside the lock so concurrent misses do not serialize
+    if recommendation_type == 'stream':
+        recommendations = calculate_stream_recommendation(user_profile)
+    elif recommendation_type == 'college':
+        recommendations = calculate_college_recommendations(user_profile, limit)
+    else:
+        recommendations = calculate_career_recommendations(user_profile)
+    content = RECOMMENDATION_ADAPTERS[recommendation_type].dump_json(recommendations)
+    
+    with response_cache_lock:
+        response_cache[key] = content
+        response_cache.move_to_end(key)
+        if len(response_cache) > RESPONSE_CACHE_SIZE:
+            response_cache.popitem(last=False)
+    
+    return content
+
+def clear_response_cache():
+    """Drop every cached response, e.g. after the data is reloaded"""
+    with response_cache_lock:
+        response_cache.clear()
+
+# Static payload, serialized once at import time
+ROOT_RESPONSE = orjson.dumps(
+    {"message": "EduNiti AI Recommendation Engine is running!", "status": "healthy"}
+)
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    return {"message": "EduNiti AI Recommendation Engine is running!", "status": "healthy"}
+    return Response(content=ROOT_RESPONSE, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
@@ -323,31 +565,44 @@ async def health_check():
     }
 
 @app.post("/recommendations/stream", response_model=List[StreamRecommendation])
-async def get_stream_recommendations(user_profile: UserProfile):
+def get_stream_recommendations(user_profile: UserProfile):
     """Get stream recommendations for a user"""
     try:
-        recommendations = calculate_stream_recommendation(user_profile)
-        return recommendations
+        content = cached_recommendations('stream', user_profile)
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error(f"Error in stream recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail="Error generating stream recommendations")
 
+# Upper bound on profiles per batch request, keeping each scoring matrix small
+MAX_BATCH_SIZE = 100
+
+@app.post("/recommendations/stream/batch", response_model=List[List[StreamRecommendation]])
+def get_batch_stream_recommendations(user_profiles: Annotated[List[UserProfile], Body(max_length=MAX_BATCH_SIZE)]):
+    """Get stream recommendations for several users in one request"""
+    try:
+        recommendations = calculate_batch_stream_recommendations(user_profiles)
+        return recommendations
+    except Exception as e:
+        logger.error(f"Error in batch stream recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error generating stream recommendations")
+
 @app.post("/recommendations/college", response_model=List[CollegeRecommendation])
-async def get_college_recommendations(user_profile: UserProfile, limit: int = 10):
+def get_college_recommendations(user_profile: UserProfile, limit: int = 10):
     """Get college recommendations for a user"""
     try:
-        recommendations = calculate_college_recommendations(user_profile, limit)
-        return recommendations
+        content = cached_recommendations('college', user_profile, limit)
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error(f"Error in college recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail="Error generating college recommendations")
 
 @app.post("/recommendations/career", response_model=List[CareerPathway])
-async def get_career_recommendations(user_profile: UserProfile):
+def get_career_recommendations(user_profile: UserProfile):
     """Get career recommendations for a user"""
     try:
-        recommendations = calculate_career_recommendations(user_profile)
-        return recommendations
+        content = cached_recommendations('career', user_profile)
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error(f"Error in career recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail="Error generating career recommendations")
@@ -379,6 +634,21 @@ async def process_quiz_results(quiz_responses: List[QuizResponse]):
         logger.error(f"Error processing quiz results: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing quiz results")
 
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring affinity limits where the OS reports them"""
+    if hasattr(os, "process_cpu_count"):  # Python 3.13+
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Scoring is CPU-bound, so run one worker process per available CPU; each
+    # worker builds its own read-only indexes in the startup event
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=int(os.getenv("API_WORKERS", available_cpus()))
+    )
@@ -0,0 +1,67 @@
+"""
+Regression checks for the EduNiti AI Recommendation Engine API
+Run from ai-engine/ with: python -m pytest -q
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+# Raw bodies: the client's own JSON encoder refuses NaN
+@pytest.mark.parametrize("body", [
+    '{"user_id": "u1", "age": 100000000000000000000, "interests": ["Tech"]}',
+    '{"user_id": "u2", "location": {"state": "Delhi", "pin": 100000000000000000000}}',
+    '{"user_id": "u3", "quiz_scores": {"Physics": NaN}}',
+])
+@pytest.mark.parametrize("recommendation_type", ["stream", "college", "career"])
+def test_unusual_but_valid_profiles_are_served(client, body, recommendation_type):
+    """Big integers and NaN scores are valid input and must not break the response cache"""
+    response = client.post(
+        f"/recommendations/{recommendation_type}",
+        content=body,
+        headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 200
+
+
+def test_cache_key_ignores_user_id_and_dict_order(client):
+    main.clear_response_cache()
+    first = client.post("/recommendations/college", json={
+        "user_id": "a", "interests": ["Tech"], "quiz_scores": {"Physics": 90, "History": 70}
+    })
+    second = client.post("/recommendations/college", json={
+        "user_id": "b", "interests": ["Tech"], "quiz_scores": {"History": 70, "Physics": 90}
+    })
+    assert first.json() == second.json()
+    assert len(main.response_cache) == 1
+
+
+def test_batch_stream_matches_single_profile_results(client):
+    profiles = [
+        {"user_id": "a", "interests": ["Physics", "Teacher"], "quiz_scores": {"Mathematics": 8}},
+        {"user_id": "b", "interests": ["History"], "quiz_scores": {"economics": 6, "History": 9}},
+        {"user_id": "c"},
+    ]
+    batch = client.post("/recommendations/stream/batch", json=profiles)
+    assert batch.status_code == 200
+    assert batch.json() == [client.post("/recommendations/stream", json=p).json() for p in profiles]
+
+
+def test_batch_stream_accepts_empty_list(client):
+    response = client.post("/recommendations/stream/batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_batch_stream_rejects_oversized_batch(client):
+    profiles = [{"user_id": str(i)} for i in range(main.MAX_BATCH_SIZE + 1)]
+    response = client.post("/recommendations/stream/batch", json=profiles)
+    assert response.status_code == 422